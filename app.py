@@ -1,56 +1,142 @@
 # app.py - Updated Flask routes with Supabase integration
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from supabase_client import disaster_service, emergency_service
+from flask_caching import Cache
+from supabase_client import disaster_service, emergency_service, ReportIn, REPORT_LIST_FIELDS
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import msgspec
+from typing import Annotated
 
 load_dotenv()
 
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Use the encoded bytes as the body directly, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, default=str), mimetype='application/json')
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
+# Shared cache for expensive read endpoints; use Redis when available so all
+# Gunicorn workers see the same entries
+cache = Cache(app, config={
+    'CACHE_TYPE': 'RedisCache' if os.getenv('REDIS_URL') else 'SimpleCache',
+    'CACHE_REDIS_URL': os.getenv('REDIS_URL'),
+    'CACHE_DEFAULT_TIMEOUT': 60
+})
+
+DASHBOARD_STATS_CACHE_KEY = 'dashboard_stats'
+
+STATUS_CHOICES = ['Pending', 'In Progress', 'Resolved', 'Cancelled']
+VALID_STATUSES = frozenset(STATUS_CHOICES)
+INVALID_STATUS_ERROR = f'Invalid status. Must be one of: {STATUS_CHOICES}'
+INVALID_FIELDS_ERROR = f'Invalid fields. Must be a comma-separated subset of: {sorted(REPORT_LIST_FIELDS)}'
+
+# Reports accepted per batch request, matching the insert batcher's batch size
+MAX_BATCH_REPORTS = 50
+BatchItems = Annotated[list[msgspec.Raw], msgspec.Meta(max_length=MAX_BATCH_REPORTS)]
+
+# Background workers for emergency alerts so responses don't wait on them
+alert_executor = ThreadPoolExecutor(max_workers=8)
+
+def build_create_response(report, result):
+    """Response body for one create attempt, alerting on critical reports"""
+    if not result['success']:
+        return {'error': result['error']}
+    
+    report_data = result['data']
+    
+    # Trigger emergency alerts for critical reports in the background
+    if report.severity == 'Critical':
+        alert_executor.submit(emergency_service.trigger_emergency_alert, report_data)
+    
+    return {
+        'id': result['id'],
+        'status': 'success',
+        'message': 'Report created successfully',
+        'data': report_data
+    }
+
 @app.route('/api/reports', methods=['POST'])
 def create_report():
     """Create a new disaster report from Telegram bot"""
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['user_id', 'disaster_type', 'severity', 'latitude', 'longitude']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        # Decode and validate the body in one pass
+        try:
+            report = msgspec.json.decode(request.get_data(), type=ReportIn, strict=False)
+        except msgspec.DecodeError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Create report using Supabase service
-        result = disaster_service.create_report(data)
+        result = disaster_service.create_report(report)
         
         if result['success']:
-            report_data = result['data']
-            
-            # Trigger emergency alerts for critical reports
-            if data['severity'] == 'Critical':
-                emergency_service.trigger_emergency_alert(report_data)
-            
-            return jsonify({
-                'id': result['id'],
-                'status': 'success',
-                'message': 'Report created successfully',
-                'data': report_data
-            }), 201
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
+            return jsonify(build_create_response(report, result)), 201
         else:
             return jsonify({'error': result['error']}), 500
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/reports/batch', methods=['POST'])
+def create_reports_batch():
+    """Create several disaster reports in one request"""
+    try:
+        try:
+            items = msgspec.json.decode(request.get_data(), type=BatchItems)
+        except msgspec.DecodeError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Validate each report on its own so one bad item doesn't reject the rest
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, msgspec.json.decode(item, type=ReportIn, strict=False)))
+            except msgspec.DecodeError as e:
+                results[index] = {'error': str(e)}
+        
+        created = disaster_service.create_reports([report for _, report in valid])
+        for (index, report), result in zip(valid, created):
+            results[index] = build_create_response(report, result)
+        
+        if any(result['success'] for result in created):
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
+        
+        return jsonify({'results': results}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/reports/user/<user_id>', methods=['GET'])
 def get_user_reports(user_id):
     """Get reports for a specific user"""
     try:
         limit = request.args.get('limit', 10, type=int)
-        result = disaster_service.get_user_reports(user_id, limit)
+        
+        fields = request.args.get('fields')
+        if fields:
+            if not set(fields.split(',')) <= REPORT_LIST_FIELDS:
+                return jsonify({'error': INVALID_FIELDS_ERROR}), 400
+            result = disaster_service.get_user_reports(user_id, limit, fields)
+        else:
+            result = disaster_service.get_user_reports(user_id, limit)
         
         if result['success']:
             return jsonify(result['data']), 200
@@ -81,13 +167,13 @@ def update_report_status(report_id):
         data = request.get_json()
         new_status = data.get('status')
         
-        valid_statuses = ['Pending', 'In Progress', 'Resolved', 'Cancelled']
-        if not new_status or new_status not in valid_statuses:
-            return jsonify({'error': f'Invalid status. Must be one of: {valid_statuses}'}), 400
+        if new_status not in VALID_STATUSES:
+            return jsonify({'error': INVALID_STATUS_ERROR}), 400
         
         result = disaster_service.update_report_status(report_id, new_status)
         
         if result['success']:
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
             return jsonify({
                 'message': 'Status updated successfully',
                 'data': result['data']
@@ -113,12 +199,37 @@ def get_all_reports():
         
         limit = request.args.get('limit', 50, type=int)
         
-        result = disaster_service.get_all_reports(filters, limit)
+        # Keyset cursor from the previous page's next_cursor
+        cursor = None
+        before = request.args.get('before')
+        before_id = request.args.get('before_id')
+        if before or before_id:
+            if not before or not before_id:
+                return jsonify({'error': 'before and before_id must be given together'}), 400
+            if not before_id.replace('-', '').isalnum():
+                return jsonify({'error': 'Invalid before_id'}), 400
+            try:
+                # An unencoded '+' in the UTC offset arrives as a space
+                before = datetime.fromisoformat(before.replace(' ', '+')).isoformat()
+            except ValueError:
+                return jsonify({'error': 'before must be an ISO 8601 timestamp'}), 400
+            cursor = (before, before_id)
+        
+        result = disaster_service.get_all_reports(filters, limit, cursor)
         
         if result['success']:
+            reports = result['data']
+            next_cursor = None
+            if reports and len(reports) == limit:
+                next_cursor = {
+                    'before': reports[-1]['created_at'],
+                    'before_id': reports[-1]['id']
+                }
+            
             return jsonify({
-                'reports': result['data'],
-                'count': len(result['data'])
+                'reports': reports,
+                'count': len(reports),
+                'next_cursor': next_cursor
             }), 200
         else:
             return jsonify({'error': result['error']}), 500
@@ -153,44 +264,17 @@ def get_nearby_reports():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/dashboard/stats', methods=['GET'])
+@cache.cached(key_prefix=DASHBOARD_STATS_CACHE_KEY, response_filter=lambda rv: rv[1] == 200)
 def get_dashboard_stats():
     """Get dashboard statistics"""
     try:
-        # Get all reports for statistics
-        result = disaster_service.get_all_reports()
+        # Aggregates are computed by the dashboard_stats database function
+        result = disaster_service.get_dashboard_stats()
         
         if not result['success']:
             return jsonify({'error': result['error']}), 500
         
-        reports = result['data']
-        
-        # Calculate statistics
-        stats = {
-            'total_reports': len(reports),
-            'pending_reports': len([r for r in reports if r['status'] == 'Pending']),
-            'resolved_reports': len([r for r in reports if r['status'] == 'Resolved']),
-            'critical_reports': len([r for r in reports if r['severity'] == 'Critical']),
-            'disaster_types': {},
-            'severity_breakdown': {
-                'Low': 0,
-                'Medium': 0,
-                'High': 0,
-                'Critical': 0
-            },
-            'recent_reports': reports[:5]  # Last 5 reports
-        }
-        
-        # Count disaster types
-        for report in reports:
-            disaster_type = report['disaster_type']
-            stats['disaster_types'][disaster_type] = stats['disaster_types'].get(disaster_type, 0) + 1
-            
-            # Count severity levels
-            severity = report['severity']
-            if severity in stats['severity_breakdown']:
-                stats['severity_breakdown'][severity] += 1
-        
-        return jsonify(stats), 200
+        return jsonify(result['data']), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -213,4 +297,4 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
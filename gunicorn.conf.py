@@ -0,0 +1,23 @@
+# gunicorn.conf.py - Gunicorn settings for the Flask API
+import multiprocessing
+import os
+
+bind = '0.0.0.0:5000'
+
+# Threaded workers let the I/O-bound Supabase calls overlap. Set
+# GUNICORN_WORKER_CLASS=gevent to multiplex many more in-flight requests per
+# worker on cooperative sockets without changing the Flask code.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = 8
+worker_connections = 1000
+timeout = 60
+
+def when_ready(server):
+    # Without Redis each worker has its own SimpleCache, so a report written
+    # through one worker leaves the others serving stale dashboard stats
+    if workers > 1 and not os.getenv('REDIS_URL'):
+        server.log.warning(
+            'REDIS_URL is not set: %d workers each keep a separate cache, '
+            'dashboard stats may be up to 60s stale', workers
+        )
@@ -0,0 +1,18 @@
+-- 001_reports_geography.sql - Spatial lookup for nearby reports
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+ALTER TABLE disaster_reports
+    ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)
+    GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_reports_geog ON disaster_reports USING GIST (geog);
+
+-- Reports within radius_km of (lat, lng), used by DisasterReportService.get_reports_by_location
+CREATE OR REPLACE FUNCTION reports_within(lat float8, lng float8, radius_km float8)
+RETURNS SETOF disaster_reports
+LANGUAGE sql STABLE
+AS $$
+    SELECT *
+    FROM disaster_reports
+    WHERE ST_DWithin(geog, ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography, radius_km * 1000)
+$$;
@@ -0,0 +1,36 @@
+-- 002_dashboard_stats.sql - Dashboard aggregates computed in the database
+CREATE OR REPLACE FUNCTION dashboard_stats()
+RETURNS json
+LANGUAGE sql STABLE
+AS $$
+    SELECT json_build_object(
+        'total_reports', COUNT(*),
+        'pending_reports', COUNT(*) FILTER (WHERE status = 'Pending'),
+        'resolved_reports', COUNT(*) FILTER (WHERE status = 'Resolved'),
+        'critical_reports', COUNT(*) FILTER (WHERE severity = 'Critical'),
+        'disaster_types', COALESCE((
+            SELECT json_object_agg(disaster_type, type_count)
+            FROM (
+                SELECT disaster_type, COUNT(*) AS type_count
+                FROM disaster_reports
+                GROUP BY disaster_type
+            ) types
+        ), '{}'::json),
+        'severity_breakdown', json_build_object(
+            'Low', COUNT(*) FILTER (WHERE severity = 'Low'),
+            'Medium', COUNT(*) FILTER (WHERE severity = 'Medium'),
+            'High', COUNT(*) FILTER (WHERE severity = 'High'),
+            'Critical', COUNT(*) FILTER (WHERE severity = 'Critical')
+        ),
+        'recent_reports', COALESCE((
+            SELECT json_agg(to_jsonb(recent) - 'geog' ORDER BY recent.created_at DESC)
+            FROM (
+                SELECT *
+                FROM disaster_reports
+                ORDER BY created_at DESC
+                LIMIT 5
+            ) recent
+        ), '[]'::json)
+    )
+    FROM disaster_reports
+$$;
@@ -0,0 +1,11 @@
+-- 003_report_indexes.sql - Indexes matching the report list queries
+-- Each index serves an equality filter plus ORDER BY created_at DESC, so rows
+-- come back in index order without a separate sort step. Lookups and updates
+-- by id already use the primary key index.
+CREATE INDEX IF NOT EXISTS idx_reports_user_created ON disaster_reports (user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_reports_status_created ON disaster_reports (status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_reports_severity_created ON disaster_reports (severity, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_reports_type_created ON disaster_reports (disaster_type, created_at DESC);
+
+-- Unfiltered listing and the dashboard's recent reports
+CREATE INDEX IF NOT EXISTS idx_reports_created ON disaster_reports (created_at DESC);
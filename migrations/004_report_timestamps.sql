@@ -0,0 +1,23 @@
+-- 004_report_timestamps.sql - Server-side timestamps
+ALTER TABLE disaster_reports
+    ALTER COLUMN created_at SET DEFAULT now(),
+    ALTER COLUMN updated_at SET DEFAULT now();
+
+ALTER TABLE emergency_alerts
+    ALTER COLUMN created_at SET DEFAULT now();
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS disaster_reports_set_updated_at ON disaster_reports;
+CREATE TRIGGER disaster_reports_set_updated_at
+    BEFORE UPDATE ON disaster_reports
+    FOR EACH ROW
+    EXECUTE FUNCTION set_updated_at();
@@ -0,0 +1,12 @@
+-- 005_photos_jsonb.sql - Store photos as a JSONB array instead of an encoded string
+-- Older rows hold the array JSON-encoded as a string (from a TEXT column or a
+-- JSONB string scalar); unwrap those so every row holds a real array.
+ALTER TABLE disaster_reports
+    ALTER COLUMN photos TYPE jsonb
+    USING CASE
+        WHEN jsonb_typeof(photos::jsonb) = 'string' THEN (photos::jsonb #>> '{}')::jsonb
+        ELSE photos::jsonb
+    END;
+
+ALTER TABLE disaster_reports
+    ALTER COLUMN photos SET DEFAULT '[]'::jsonb;
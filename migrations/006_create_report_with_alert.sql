@@ -0,0 +1,33 @@
+-- 006_create_report_with_alert.sql - Insert a report and its emergency alert in one call
+CREATE OR REPLACE FUNCTION create_report_with_alert(payload jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    r disaster_reports;
+BEGIN
+    -- List the columns so created_at/updated_at keep their defaults and the
+    -- generated geog column is left to the database
+    INSERT INTO disaster_reports (
+        id, user_id, username, disaster_type, severity, latitude, longitude,
+        description, photos, status, source
+    )
+    SELECT
+        id, user_id, username, disaster_type, severity, latitude, longitude,
+        description, photos, status, source
+    FROM jsonb_populate_record(NULL::disaster_reports, payload)
+    RETURNING * INTO r;
+
+    IF r.severity = 'Critical' THEN
+        INSERT INTO emergency_alerts (
+            report_id, alert_type, severity, location, disaster_type, description, status
+        )
+        VALUES (
+            r.id, 'Critical Disaster Report', r.severity, concat(r.latitude, ', ', r.longitude),
+            r.disaster_type, r.description, 'Active'
+        );
+    END IF;
+
+    RETURN to_jsonb(r) - 'geog';
+END;
+$$;
@@ -0,0 +1,12 @@
+-- 007_reports_within_columns.sql - Keep the generated geog column out of reports_within results
+-- The return type changes, so the function has to be dropped rather than replaced.
+DROP FUNCTION IF EXISTS reports_within(float8, float8, float8);
+
+CREATE FUNCTION reports_within(lat float8, lng float8, radius_km float8)
+RETURNS SETOF jsonb
+LANGUAGE sql STABLE
+AS $$
+    SELECT to_jsonb(r) - 'geog'
+    FROM disaster_reports r
+    WHERE ST_DWithin(r.geog, ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography, radius_km * 1000)
+$$;
@@ -1,13 +1,19 @@
 # run.py - Complete startup script
+import asyncio
 import threading
 import time
 import os
+import subprocess
 import sys
+import requests
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+HEALTH_CHECK_URL = 'http://localhost:5000/api/health'
+HEALTH_CHECK_DELAYS = (0.1, 0.2, 0.4, 0.8, 1.6)
+
 def check_environment():
     """Check if all required environment variables are set"""
     required_vars = [
@@ -35,31 +41,46 @@ def run_flask_app():
     """Run the Flask API server"""
     print("🚀 Starting Flask API server on http://localhost:5000...")
     try:
-        # Import here to avoid issues with threading
-        import app
-        app.app.run(debug=False, host='0.0.0.0', port=5000, use_reloader=False)
+        if os.name == 'nt':
+            # Gunicorn does not run on Windows, fall back to the development server
+            import app
+            app.app.run(debug=False, host='0.0.0.0', port=5000, use_reloader=False)
+            return
+        
+        # Serve the API with Gunicorn threaded workers (see gunicorn.conf.py)
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if process.wait() != 0:
+            print(f"❌ Gunicorn exited with code {process.returncode}")
     except Exception as e:
         print(f"❌ Error starting Flask app: {e}")
         sys.exit(1)
 
+def wait_for_api():
+    """Poll the API health endpoint with exponential backoff until it responds"""
+    with requests.Session() as session:
+        for delay in HEALTH_CHECK_DELAYS:
+            try:
+                response = session.get(HEALTH_CHECK_URL, timeout=1)
+                if response.ok:
+                    return True
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(delay)
+    return False
+
 def run_telegram_bot():
     """Run the Telegram bot"""
     print("🤖 Starting Telegram bot...")
     try:
-        import time
-        time.sleep(3)
-        import requests
-        try:
-            response = requests.get('http://localhost:5000/api/health', timeout=5)
-            if response.status_code == 200:
-                print("✅ Flask API is running and accessible")
-            else:
-                print("⚠️ Flask API is running but returned unexpected status")
-        except requests.exceptions.RequestException:
+        if wait_for_api():
+            print("✅ Flask API is running and accessible")
+        else:
             print("⚠️ Could not connect to Flask API, but continuing with bot startup...")
 
         # --- FIX: Set up event loop for this thread ---
-        import asyncio
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         # Now import and run the bot
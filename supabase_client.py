@@ -1,52 +1,190 @@
 # supabase_client.py - Supabase client setup
 import os
 from supabase import create_client, Client
-from datetime import datetime
-import uuid
-import json
+from postgrest.exceptions import APIError
+from postgrest.utils import SyncClient
+import httpx
+import base64
+import secrets
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import numpy as np
+import msgspec
+from typing import Annotated, Optional, Union
 
 # Supabase configuration
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_ANON_KEY')
 
+def use_connection_pool(client: Client):
+    """Send the client's PostgREST requests through a pooled HTTP/2 keep-alive session"""
+    postgrest = client.postgrest
+    session = SyncClient(
+        base_url=postgrest.session.base_url,
+        headers=postgrest.session.headers,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        timeout=10.0
+    )
+    postgrest.session.close()
+    postgrest.session = session
+
 # Create Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+use_connection_pool(supabase)
+
+# Every stored column except the generated geog, which clients can't use
+REPORT_COLUMNS = 'id,user_id,username,disaster_type,severity,latitude,longitude,' \
+    'description,photos,status,source,created_at,updated_at'
+
+# Columns returned by list endpoints; full rows are only fetched by ID
+REPORT_LIST_COLUMNS = 'id,disaster_type,severity,status,latitude,longitude,created_at'
+REPORT_LIST_FIELDS = frozenset(REPORT_LIST_COLUMNS.split(','))
+
+MAX_REPORT_PHOTOS = 10
+
+class ReportIn(msgspec.Struct):
+    """Request body for creating a disaster report"""
+    user_id: Union[int, str]
+    disaster_type: str
+    severity: str
+    latitude: float
+    longitude: float
+    username: Optional[str] = 'Anonymous'
+    description: str = ''
+    photos: Annotated[list, msgspec.Meta(max_length=MAX_REPORT_PHOTOS)] = []
+
+# Longer than the HTTP timeout so a slow insert is reported as its own error
+BATCH_RESULT_TIMEOUT = 15
+
+class ReportInsertBatcher:
+    """Coalesces report inserts that arrive close together into one request"""
+    
+    def __init__(self, client, window=0.05, max_batch=50):
+        self.supabase = client
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def submit(self, row):
+        """Queue a row for insertion, returning a Future for the inserted record"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        
+        future = Future()
+        self._queue.put((row, future))
+        return future
+    
+    def _run(self):
+        while True:
+            # Block for the first row, then collect whatever arrives within the window
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # Skip rows whose caller gave up waiting, so a report answered as
+            # failed is never stored afterwards
+            batch = [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+            if batch:
+                self._flush(batch)
+    
+    def _flush(self, batch):
+        try:
+            result = self.supabase.table('disaster_reports')\
+                .insert([row for row, _ in batch])\
+                .execute()
+        except APIError as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # The database rejected the insert and rolled it back, so one bad
+                # row failed the whole batch; retry them one at a time
+                for item in batch:
+                    self._flush([item])
+            return
+        except Exception as e:
+            # A transport error leaves it unknown whether the insert committed, and
+            # retrying rows that were stored would only fail on their duplicate ids
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        inserted = {record['id']: record for record in result.data}
+        for row, future in batch:
+            future.set_result(inserted.get(row['id']))
 
 class DisasterReportService:
     def __init__(self):
         self.supabase = supabase
+        self.insert_batcher = ReportInsertBatcher(supabase)
+    
+    def create_report(self, report):
+        """Create a new disaster report in Supabase from a validated ReportIn"""
+        return self.create_reports([report])[0]
     
-    def create_report(self, report_data):
-        """Create a new disaster report in Supabase"""
+    def create_reports(self, reports):
+        """Create several reports, queueing them all before waiting so the
+        non-critical ones share a batched insert"""
+        pending = [self._submit_report(report) for report in reports]
+        return [self._wait_for_report(report_id, future) for report_id, future in pending]
+    
+    def _submit_report(self, report):
+        """Start inserting a report, returning its ID and a Future for the stored row"""
+        # Generate unique report ID: 12 base32 characters carry 60 random bits,
+        # short enough to read out while keeping collisions negligible
+        report_id = base64.b32encode(secrets.token_bytes(8)).decode()[:12]
+        
+        # Prepare data for insertion
+        db_data = {
+            'id': report_id,
+            'user_id': str(report.user_id),
+            'username': report.username,
+            'disaster_type': report.disaster_type,
+            'severity': report.severity,
+            'latitude': report.latitude,
+            'longitude': report.longitude,
+            'description': report.description,
+            'photos': report.photos,
+            'status': 'Pending',
+            'source': 'Telegram Bot'
+        }
+        
+        if db_data['severity'] != 'Critical':
+            return report_id, self.insert_batcher.submit(db_data)
+        
+        # Critical reports skip the batching window, and the database logs
+        # their emergency alert in the same call
+        future = Future()
         try:
-            # Generate unique report ID
-            report_id = str(uuid.uuid4())[:8].upper()
-            
-            # Prepare data for insertion
-            db_data = {
-                'id': report_id,
-                'user_id': str(report_data['user_id']),
-                'username': report_data.get('username', 'Anonymous'),
-                'disaster_type': report_data['disaster_type'],
-                'severity': report_data['severity'],
-                'latitude': float(report_data['latitude']),
-                'longitude': float(report_data['longitude']),
-                'description': report_data.get('description', ''),
-                'photos': json.dumps(report_data.get('photos', [])),
-                'status': 'Pending',
-                'source': 'Telegram Bot',
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
-            
-            # Insert into Supabase
-            result = self.supabase.table('disaster_reports').insert(db_data).execute()
+            result = self.supabase.rpc('create_report_with_alert', {'payload': db_data}).execute()
+            future.set_result(result.data)
+        except Exception as e:
+            future.set_exception(e)
+        return report_id, future
+    
+    def _wait_for_report(self, report_id, future):
+        try:
+            record = future.result(timeout=BATCH_RESULT_TIMEOUT)
             
-            if result.data:
+            if record:
                 return {
                     'success': True,
                     'id': report_id,
-                    'data': result.data[0]
+                    'data': record
                 }
             else:
                 return {
@@ -54,17 +192,25 @@ class DisasterReportService:
                     'error': 'Failed to create report'
                 }
                 
+        except FutureTimeoutError:
+            # Cancelling stops the batcher from inserting the row later; if the insert
+            # is already running it can't be stopped and its outcome is unknown
+            future.cancel()
+            return {
+                'success': False,
+                'error': 'Timed out waiting for insert'
+            }
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def get_user_reports(self, user_id, limit=10):
-        """Get reports for a specific user"""
+    def get_user_reports(self, user_id, limit=10, columns=REPORT_LIST_COLUMNS):
+        """Get reports for a specific user, newest first"""
         try:
             result = self.supabase.table('disaster_reports')\
-                .select('*')\
+                .select(columns)\
                 .eq('user_id', str(user_id))\
                 .order('created_at', desc=True)\
                 .limit(limit)\
@@ -84,22 +230,28 @@ class DisasterReportService:
     def get_report_by_id(self, report_id):
         """Get a specific report by ID"""
         try:
+            # single() asks PostgREST for a bare object rather than a one-row array
             result = self.supabase.table('disaster_reports')\
-                .select('*')\
+                .select(REPORT_COLUMNS)\
                 .eq('id', report_id)\
+                .single()\
                 .execute()
             
-            if result.data:
-                return {
-                    'success': True,
-                    'data': result.data[0]
-                }
-            else:
+            return {
+                'success': True,
+                'data': result.data
+            }
+            
+        except APIError as e:
+            if e.code == 'PGRST116':
                 return {
                     'success': False,
                     'error': 'Report not found'
                 }
-                
+            return {
+                'success': False,
+                'error': str(e)
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -110,10 +262,7 @@ class DisasterReportService:
         """Update report status"""
         try:
             result = self.supabase.table('disaster_reports')\
-                .update({
-                    'status': status,
-                    'updated_at': datetime.now().isoformat()
-                })\
+                .update({'status': status})\
                 .eq('id', report_id)\
                 .execute()
             
@@ -134,10 +283,13 @@ class DisasterReportService:
                 'error': str(e)
             }
     
-    def get_all_reports(self, filters=None, limit=50):
-        """Get all reports with optional filters"""
+    def get_all_reports(self, filters=None, limit=50, cursor=None):
+        """Get all reports with optional filters, newest first
+        
+        cursor is the (created_at, id) of the last report of the previous page.
+        """
         try:
-            query = self.supabase.table('disaster_reports').select('*')
+            query = self.supabase.table('disaster_reports').select(REPORT_LIST_COLUMNS)
             
             if filters:
                 if 'severity' in filters:
@@ -147,7 +299,17 @@ class DisasterReportService:
                 if 'status' in filters:
                     query = query.eq('status', filters['status'])
             
-            result = query.order('created_at', desc=True).limit(limit).execute()
+            if cursor:
+                # Keyset pagination: only rows strictly after the cursor in (created_at, id) order
+                before, before_id = cursor
+                query.params = query.params.add(
+                    'or',
+                    f'(created_at.lt."{before}",and(created_at.eq."{before}",id.lt."{before_id}"))'
+                )
+            
+            # Break created_at ties on id so pages never skip or repeat rows
+            query.params = query.params.add('order', 'created_at.desc,id.desc')
+            result = query.limit(limit).execute()
             
             return {
                 'success': True,
@@ -160,24 +322,53 @@ class DisasterReportService:
                 'error': str(e)
             }
     
-    def get_reports_by_location(self, lat, lng, radius_km=10):
-        """Get reports within a certain radius (simplified version)"""
+    def get_dashboard_stats(self):
+        """Get report counts and recent reports for the dashboard"""
         try:
-            # Note: For more accurate geo-queries, you might want to use PostGIS functions
-            # This is a simplified version
-            result = self.supabase.table('disaster_reports')\
-                .select('*')\
-                .execute()
+            result = self.supabase.rpc('dashboard_stats', {}).execute()
             
-            # Filter by distance (basic implementation)
-            filtered_reports = []
-            for report in result.data:
-                if self._calculate_distance(lat, lng, report['latitude'], report['longitude']) <= radius_km:
-                    filtered_reports.append(report)
+            return {
+                'success': True,
+                'data': result.data
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_reports_by_location(self, lat, lng, radius_km=10):
+        """Get reports within a certain radius using the PostGIS reports_within function"""
+        try:
+            try:
+                result = self.supabase.rpc('reports_within', {
+                    'lat': lat,
+                    'lng': lng,
+                    'radius_km': radius_km
+                }).execute()
+                reports = result.data
+            except APIError:
+                # reports_within is not available (migration not applied), narrow the
+                # query to a bounding box and run the exact distance check in Python
+                delta_lat = radius_km / 111.0
+                delta_lng = radius_km / (111.0 * max(math.cos(math.radians(lat)), 1e-6))
+                
+                query = self.supabase.table('disaster_reports')\
+                    .select(REPORT_COLUMNS)\
+                    .gte('latitude', lat - delta_lat)\
+                    .lte('latitude', lat + delta_lat)
+                
+                # Skip the longitude bounds when the box wraps around the antimeridian
+                if -180 <= lng - delta_lng and lng + delta_lng <= 180:
+                    query = query.gte('longitude', lng - delta_lng).lte('longitude', lng + delta_lng)
+                
+                result = query.execute()
+                reports = self._filter_by_distance(result.data, lat, lng, radius_km)
             
             return {
                 'success': True,
-                'data': filtered_reports
+                'data': reports
             }
             
         except Exception as e:
@@ -186,23 +377,22 @@ class DisasterReportService:
                 'error': str(e)
             }
     
-    def _calculate_distance(self, lat1, lon1, lat2, lon2):
-        """Calculate distance between two points in kilometers"""
-        import math
-        
+    def _filter_by_distance(self, reports, lat, lng, radius_km):
+        """Keep reports whose haversine distance from (lat, lng) is within radius_km"""
         R = 6371  # Earth's radius in kilometers
         
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
+        lats = np.fromiter((r['latitude'] for r in reports), dtype=np.float64, count=len(reports))
+        lngs = np.fromiter((r['longitude'] for r in reports), dtype=np.float64, count=len(reports))
         
-        a = (math.sin(delta_lat / 2) * math.sin(delta_lat / 2) +
-             math.cos(lat1_rad) * math.cos(lat2_rad) *
-             math.sin(delta_lon / 2) * math.sin(delta_lon / 2))
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        delta_lat = np.radians(lats - lat)
+        delta_lon = np.radians(lngs - lng)
         
-        return R * c
+        a = (np.sin(delta_lat / 2) ** 2 +
+             np.cos(np.radians(lat)) * np.cos(np.radians(lats)) *
+             np.sin(delta_lon / 2) ** 2)
+        distances = 2 * R * np.arcsin(np.sqrt(a))
+        
+        return [reports[i] for i in np.nonzero(distances <= radius_km)[0]]
 
 # Emergency notification service
 class EmergencyNotificationService:
@@ -210,23 +400,12 @@ class EmergencyNotificationService:
         self.supabase = supabase
     
     def trigger_emergency_alert(self, report_data):
-        """Trigger emergency notifications for critical reports"""
+        """Trigger emergency notifications for critical reports
+        
+        The emergency_alerts row is written by create_report_with_alert together
+        with the report, so this only handles outbound notifications.
+        """
         try:
-            # Log emergency alert
-            alert_data = {
-                'report_id': report_data['id'],
-                'alert_type': 'Critical Disaster Report',
-                'severity': report_data['severity'],
-                'location': f"{report_data['latitude']}, {report_data['longitude']}",
-                'disaster_type': report_data['disaster_type'],
-                'description': report_data.get('description', ''),
-                'status': 'Active',
-                'created_at': datetime.now().isoformat()
-            }
-            
-            # Store alert in emergency_alerts table
-            result = self.supabase.table('emergency_alerts').insert(alert_data).execute()
-            
             # Here you can add integrations with:
             # - SMS services (Twilio)
             # - Email notifications
@@ -241,8 +420,7 @@ class EmergencyNotificationService:
             print(f"Location: {report_data['latitude']}, {report_data['longitude']}")
             
             return {
-                'success': True,
-                'alert_id': result.data[0]['id'] if result.data else None
+                'success': True
             }
             
         except Exception as e:
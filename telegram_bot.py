@@ -1,16 +1,18 @@
 import os
 import logging
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
-import requests
-import json
+from telegram.constants import ParseMode
+from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, Defaults, filters, ContextTypes
+import asyncio
+import functools
+import random
+import time
+import httpx
+import orjson
+from cachetools import TTLCache
+from collections import deque
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -26,17 +28,45 @@ DISASTER_TYPES = [
 # Severity levels
 SEVERITY_LEVELS = ['Low', 'Medium', 'High', 'Critical']
 
-class DisasterReportBot:
-    def __init__(self):
-        self.user_sessions = {}
-    
-    async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Start command handler"""
-        user = update.effective_user
-        welcome_message = f"""
+@functools.lru_cache(maxsize=8)
+def _two_col_markup(items: tuple, prefix: str) -> InlineKeyboardMarkup:
+    """Two-column inline keyboard whose buttons send '<prefix>_<item>'"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(item, callback_data=f"{prefix}_{item}") for item in items[i:i + 2]]
+        for i in range(0, len(items), 2)
+    ])
+
+# Keyboards never change, so they are built once and shared by every reply
+DISASTER_TYPE_MARKUP = _two_col_markup(tuple(DISASTER_TYPES), "type")
+SEVERITY_MARKUP = _two_col_markup(tuple(SEVERITY_LEVELS), "severity")
+MAIN_REPLY_MARKUP = ReplyKeyboardMarkup([
+    [KeyboardButton("🚨 Report Disaster")],
+    [KeyboardButton("📊 My Reports"), KeyboardButton("ℹ️ Help")],
+    [KeyboardButton("🆘 Emergency")]
+], resize_keyboard=True)
+SUBMITTED_REPLY_MARKUP = ReplyKeyboardMarkup([
+    [KeyboardButton("🚨 Report Disaster")],
+    [KeyboardButton("📊 My Reports"), KeyboardButton("ℹ️ Help")]
+], resize_keyboard=True)
+LOCATION_REPLY_MARKUP = ReplyKeyboardMarkup(
+    [[KeyboardButton("📍 Share Location", request_location=True)]],
+    resize_keyboard=True,
+    one_time_keyboard=True
+)
+DESCRIPTION_REPLY_MARKUP = ReplyKeyboardMarkup([
+    [KeyboardButton("Skip Description")],
+    [KeyboardButton("🚨 Report Disaster"), KeyboardButton("Cancel")]
+], resize_keyboard=True)
+PHOTOS_REPLY_MARKUP = ReplyKeyboardMarkup([
+    [KeyboardButton("Skip Photos")],
+    [KeyboardButton("Submit Report")]
+], resize_keyboard=True)
+
+# Static reply texts; the welcome text only fills in the user's name
+WELCOME_TEMPLATE = """
 🚨 **Disaster Management System Bot** 🚨
 
-Hello {user.first_name}! I'm here to help you report disasters and emergencies.
+Hello {first_name}! I'm here to help you report disasters and emergencies.
 
 **Available Commands:**
 /report - Report a new disaster
@@ -45,20 +75,9 @@ Hello {user.first_name}! I'm here to help you report disasters and emergencies.
 /emergency - Quick emergency report
 
 Stay safe! 🙏
-        """
-        
-        keyboard = [
-            [KeyboardButton("🚨 Report Disaster")],
-            [KeyboardButton("📊 My Reports"), KeyboardButton("ℹ️ Help")],
-            [KeyboardButton("🆘 Emergency")]
-        ]
-        reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-        
-        await update.message.reply_text(welcome_message, reply_markup=reply_markup, parse_mode='Markdown')
+"""
 
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Help command handler"""
-        help_text = """
+HELP_TEXT = """
 📋 **How to Report a Disaster:**
 
 1. Use /report or click "🚨 Report Disaster"
@@ -80,57 +99,254 @@ Stay safe! 🙏
 - Emergency services will be notified for critical reports
 
 Need immediate help? Contact emergency services: 112
+"""
+
+# One entry of the /status report list
+REPORT_SUMMARY_TEMPLATE = "🆔 **{id}**\n🏷️ {disaster_type}\n📊 {severity}\n📅 {created_at}\n📋 {status}"
+REPORT_SUMMARY_DEFAULTS = {
+    'id': 'N/A',
+    'disaster_type': 'N/A',
+    'severity': 'N/A',
+    'created_at': 'N/A',
+    'status': 'Pending'
+}
+
+# /status shows the latest few reports and asks the backend for only what it renders
+USER_REPORTS_LIMIT = 5
+USER_REPORTS_FIELDS = ','.join(REPORT_SUMMARY_DEFAULTS)
+
+# Updates processed at once; this also bounds how many handlers can be waiting on the backend
+MAX_CONCURRENT_UPDATES = 32
+
+# Report sessions left idle this long are dropped
+SESSION_TTL = 1800  # seconds
+MAX_SESSIONS = 10000
+
+# Finished session dicts kept for reuse by new reports
+SESSION_POOL_SIZE = 256
+
+# Photos kept per report, bounding session memory and the submit payload
+MAX_PHOTOS = 10
+
+# Backend requests allowed in flight at once; beyond this users are asked to retry
+MAX_BACKEND_REQUESTS = 20
+BACKEND_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+# Submits aren't retried and the backend may wait up to 15s for an insert, so
+# they get longer than that; timing out earlier would report a saved report as failed
+BACKEND_SUBMIT_TIMEOUT = httpx.Timeout(20.0, connect=2.0)
+BACKEND_GET_RETRIES = 3
+BUSY_MESSAGE = "⏳ System busy, please retry in a moment."
+
+# Reports submitted close together are sent to the backend in one request
+BATCH_MAX_SIZE = 20
+BATCH_MAX_WAIT = 0.1  # seconds
+
+class BackendBusyError(Exception):
+    """Raised when too many backend requests are already in flight"""
+
+class DisasterReportBot:
+    def __init__(self):
+        # Abandoned report flows expire instead of accumulating forever
+        self.user_sessions = TTLCache(maxsize=MAX_SESSIONS, ttl=SESSION_TTL)
+        self._session_pool = deque(maxlen=SESSION_POOL_SIZE)
+        # Users whose report is currently being submitted
+        self._inflight = set()
+        # Inline keyboard callback_data prefixes and their handlers
+        self._callback_routes = {
+            'type': self._handle_type,
+            'severity': self._handle_severity
+        }
+        # Reply keyboard buttons and the handlers they trigger, registered in main()
+        self.text_routes = {
+            "🚨 Report Disaster": self.start_report,
+            "🆘 Emergency": self.emergency_report,
+            "ℹ️ Help": self.help_command,
+            "📊 My Reports": self.show_user_reports
+        }
+        # Shared async client so backend calls don't block the event loop and
+        # connections to the backend are kept alive between requests
+        self.http = httpx.AsyncClient(
+            base_url=BACKEND_API_URL,
+            timeout=BACKEND_TIMEOUT,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+        self._backend_sem = asyncio.Semaphore(MAX_BACKEND_REQUESTS)
+        self._submit_queue = asyncio.Queue()
+        self._batch_task = None
+        self._send_tasks = set()
+        self._batch_endpoint_available = True
+    
+    async def start_batching(self, application: Application):
+        """Start the task that sends queued reports to the backend in batches"""
+        self._batch_task = asyncio.create_task(self._process_submit_queue())
+    
+    async def close(self, application: Application):
+        """Stop batching and close the backend HTTP client on shutdown"""
+        if self._batch_task:
+            self._batch_task.cancel()
+        for task in self._send_tasks:
+            task.cancel()
+        await self.http.aclose()
+    
+    def _acquire_session(self, step, **report_data):
+        """Take an empty session from the pool (or create one) and fill it in"""
+        if self._session_pool:
+            session = self._session_pool.pop()
+        else:
+            session = {'report_data': {}}
+        
+        session['step'] = step
+        session['report_data'].update(report_data)
+        return session
+    
+    def _release_session(self, session):
+        """Clear a finished session and return it to the pool"""
+        session['report_data'].clear()
+        self._session_pool.append(session)
+    
+    async def log_metrics(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodic job: drop expired sessions and log load on the bot"""
+        self.user_sessions.expire()
+        logger.info(
+            "sessions=%d inflight=%d queue=%d",
+            len(self.user_sessions), len(self._inflight), self._submit_queue.qsize()
+        )
+    
+    async def _call_backend(self, method, path, **kwargs):
+        """Send a request to the backend, retrying idempotent GETs with jittered backoff
+        
+        Raises BackendBusyError instead of waiting when the backend is saturated.
         """
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+        if self._backend_sem.locked():
+            raise BackendBusyError()
+        
+        if 'json' in kwargs:
+            # orjson encodes straight to bytes, much faster than httpx's stdlib json
+            kwargs['content'] = orjson.dumps(kwargs.pop('json'))
+            kwargs['headers'] = {'Content-Type': 'application/json', **kwargs.get('headers', {})}
+        
+        async with self._backend_sem:
+            attempts = 1 + (BACKEND_GET_RETRIES if method == 'GET' else 0)
+            for attempt in range(attempts):
+                try:
+                    response = await self.http.request(method, path, **kwargs)
+                    if response.status_code < 500 or attempt == attempts - 1:
+                        return response
+                except httpx.TransportError:
+                    if attempt == attempts - 1:
+                        raise
+                await asyncio.sleep(0.2 * 2 ** attempt * (0.5 + random.random()))
+    
+    async def _queue_report(self, report_data):
+        """Add a report to the next batch and wait for the backend's result for it"""
+        future = asyncio.get_running_loop().create_future()
+        await self._submit_queue.put((report_data, future))
+        return await future
+    
+    async def _process_submit_queue(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for the first report, then collect whatever arrives within the window
+            batch = [await self._submit_queue.get()]
+            deadline = loop.time() + BATCH_MAX_WAIT
+            while len(batch) < BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._submit_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Send in the background so a slow request doesn't hold up the next
+            # batch; _backend_sem still bounds how many are in flight
+            task = asyncio.create_task(self._send_batch(batch))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+    
+    async def _send_batch(self, batch):
+        try:
+            if self._batch_endpoint_available:
+                response = await self._call_backend(
+                    "POST", "/reports/batch",
+                    json=[report for report, _ in batch], timeout=BACKEND_SUBMIT_TIMEOUT
+                )
+                if response.status_code == 404:
+                    # Older backend without the batch endpoint
+                    self._batch_endpoint_available = False
+                else:
+                    response.raise_for_status()
+                    for (_, future), result in zip(batch, orjson.loads(response.content)['results']):
+                        future.set_result(result)
+                    return
+            
+            # Each report succeeds or fails on its own, so one error doesn't mark
+            # reports the backend already created as failed
+            results = await asyncio.gather(
+                *(self._send_report(report) for report, _ in batch), return_exceptions=True
+            )
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+    
+    async def _send_report(self, report_data):
+        """Send a single report to the backend, returning its result"""
+        response = await self._call_backend(
+            "POST", "/reports", json=report_data, timeout=BACKEND_SUBMIT_TIMEOUT
+        )
+        if response.status_code == 201:
+            return orjson.loads(response.content)
+        return {'error': response.status_code}
+    
+    async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Start command handler"""
+        user = update.effective_user
+        await update.message.reply_text(
+            WELCOME_TEMPLATE.format(first_name=user.first_name),
+            reply_markup=MAIN_REPLY_MARKUP
+        )
+
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Help command handler"""
+        await update.message.reply_text(HELP_TEXT)
 
     async def start_report(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start disaster reporting process"""
         user_id = update.effective_user.id
         
         # Initialize user session
-        self.user_sessions[user_id] = {
-            'step': 'disaster_type',
-            'report_data': {
-                'user_id': user_id,
-                'username': update.effective_user.username,
-                'timestamp': datetime.now().isoformat()
-            }
-        }
-        
-        # Create inline keyboard for disaster types
-        keyboard = []
-        for i in range(0, len(DISASTER_TYPES), 2):
-            row = []
-            row.append(InlineKeyboardButton(DISASTER_TYPES[i], callback_data=f"type_{DISASTER_TYPES[i]}"))
-            if i + 1 < len(DISASTER_TYPES):
-                row.append(InlineKeyboardButton(DISASTER_TYPES[i + 1], callback_data=f"type_{DISASTER_TYPES[i + 1]}"))
-            keyboard.append(row)
+        self.user_sessions[user_id] = self._acquire_session(
+            'disaster_type',
+            user_id=user_id,
+            username=update.effective_user.username,
+            timestamp=time.time()
+        )
         
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.message.reply_text("🔍 What type of disaster are you reporting?", reply_markup=reply_markup)
+        await update.message.reply_text("🔍 What type of disaster are you reporting?", reply_markup=DISASTER_TYPE_MARKUP)
 
     async def emergency_report(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Quick emergency report"""
         user_id = update.effective_user.id
         
-        self.user_sessions[user_id] = {
-            'step': 'emergency_location',
-            'report_data': {
-                'user_id': user_id,
-                'username': update.effective_user.username,
-                'disaster_type': 'Emergency',
-                'severity': 'Critical',
-                'timestamp': datetime.now().isoformat()
-            }
-        }
-        
-        keyboard = [[KeyboardButton("📍 Share Location", request_location=True)]]
-        reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+        self.user_sessions[user_id] = self._acquire_session(
+            'emergency_location',
+            user_id=user_id,
+            username=update.effective_user.username,
+            disaster_type='Emergency',
+            severity='Critical',
+            timestamp=time.time()
+        )
         
         await update.message.reply_text(
             "🆘 **EMERGENCY REPORT**\n\nPlease share your current location immediately!",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
+            reply_markup=LOCATION_REPLY_MARKUP
         )
 
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -147,44 +363,33 @@ Need immediate help? Contact emergency services: 112
         
         session = self.user_sessions[user_id]
         
-        if data.startswith('type_'):
-            # Disaster type selection
-            disaster_type = data.replace('type_', '')
-            session['report_data']['disaster_type'] = disaster_type
-            session['step'] = 'severity'
-            
-            # Create severity keyboard
-            keyboard = []
-            for i in range(0, len(SEVERITY_LEVELS), 2):
-                row = []
-                row.append(InlineKeyboardButton(f"{SEVERITY_LEVELS[i]}", callback_data=f"severity_{SEVERITY_LEVELS[i]}"))
-                if i + 1 < len(SEVERITY_LEVELS):
-                    row.append(InlineKeyboardButton(f"{SEVERITY_LEVELS[i + 1]}", callback_data=f"severity_{SEVERITY_LEVELS[i + 1]}"))
-                keyboard.append(row)
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(
-                f"✅ Disaster Type: **{disaster_type}**\n\n📊 What is the severity level?",
-                reply_markup=reply_markup,
-                parse_mode='Markdown'
-            )
+        # callback_data is "<prefix>_<value>", e.g. "type_Flood" or "severity_High"
+        prefix, _, value = data.partition('_')
+        handler = self._callback_routes.get(prefix)
+        if handler:
+            await handler(query, session, value)
+
+    async def _handle_type(self, query, session, disaster_type):
+        """Disaster type selection"""
+        session['report_data']['disaster_type'] = disaster_type
+        session['step'] = 'severity'
         
-        elif data.startswith('severity_'):
-            # Severity selection
-            severity = data.replace('severity_', '')
-            session['report_data']['severity'] = severity
-            session['step'] = 'location'
-            
-            keyboard = [[KeyboardButton("📍 Share Location", request_location=True)]]
-            reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
-            
-            await query.edit_message_text(
-                f"✅ Disaster Type: **{session['report_data']['disaster_type']}**\n"
-                f"✅ Severity: **{severity}**\n\n"
-                f"📍 Please share your location:",
-                parse_mode='Markdown'
-            )
-            await query.message.reply_text("Click the button below to share your location:", reply_markup=reply_markup)
+        await query.edit_message_text(
+            f"✅ Disaster Type: **{disaster_type}**\n\n📊 What is the severity level?",
+            reply_markup=SEVERITY_MARKUP
+        )
+
+    async def _handle_severity(self, query, session, severity):
+        """Severity selection"""
+        session['report_data']['severity'] = severity
+        session['step'] = 'location'
+        
+        await query.edit_message_text(
+            f"✅ Disaster Type: **{session['report_data']['disaster_type']}**\n"
+            f"✅ Severity: **{severity}**\n\n"
+            f"📍 Please share your location:"
+        )
+        await query.message.reply_text("Click the button below to share your location:", reply_markup=LOCATION_REPLY_MARKUP)
 
     async def handle_location(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle location sharing"""
@@ -201,13 +406,6 @@ Need immediate help? Contact emergency services: 112
         session['report_data']['longitude'] = location.longitude
         session['step'] = 'description'
         
-        # Remove location keyboard
-        keyboard = [
-            [KeyboardButton("Skip Description")],
-            [KeyboardButton("🚨 Report Disaster"), KeyboardButton("Cancel")]
-        ]
-        reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-        
         if session['step'] == 'emergency_location':
             # For emergency reports, submit immediately
             await self.submit_report(update, context, emergency=True)
@@ -215,7 +413,7 @@ Need immediate help? Contact emergency services: 112
             await update.message.reply_text(
                 "✅ Location received!\n\n"
                 "📝 Please provide a description of the situation (or click 'Skip Description'):",
-                reply_markup=reply_markup
+                reply_markup=DESCRIPTION_REPLY_MARKUP
             )
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -223,20 +421,6 @@ Need immediate help? Contact emergency services: 112
         user_id = update.effective_user.id
         text = update.message.text
         
-        # Handle button presses
-        if text == "🚨 Report Disaster":
-            await self.start_report(update, context)
-            return
-        elif text == "🆘 Emergency":
-            await self.emergency_report(update, context)
-            return
-        elif text == "ℹ️ Help":
-            await self.help_command(update, context)
-            return
-        elif text == "📊 My Reports":
-            await self.show_user_reports(update, context)
-            return
-        
         if user_id not in self.user_sessions:
             await update.message.reply_text(
                 "👋 Hi! Use /start to begin or /report to report a disaster."
@@ -253,15 +437,9 @@ Need immediate help? Contact emergency services: 112
             
             session['step'] = 'photos'
             
-            keyboard = [
-                [KeyboardButton("Skip Photos")],
-                [KeyboardButton("Submit Report")]
-            ]
-            reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-            
             await update.message.reply_text(
                 "📸 You can now send photos (optional) or click 'Submit Report' to finish:",
-                reply_markup=reply_markup
+                reply_markup=PHOTOS_REPLY_MARKUP
             )
         
         elif text == "Submit Report":
@@ -277,21 +455,25 @@ Need immediate help? Contact emergency services: 112
         session = self.user_sessions[user_id]
         
         if session['step'] == 'photos':
+            photos = session['report_data'].setdefault('photos', [])
+            if len(photos) >= MAX_PHOTOS:
+                await update.message.reply_text(f"Max {MAX_PHOTOS} photos reached. Submit or cancel.")
+                return
+            
             # Get the largest photo
             photo = update.message.photo[-1]
-            file = await context.bot.get_file(photo.file_id)
             
-            # Store photo info (in real implementation, you'd upload to your server)
-            if 'photos' not in session['report_data']:
-                session['report_data']['photos'] = []
-            
-            session['report_data']['photos'].append({
+            # Store photo info; file_id is enough for the backend to fetch the
+            # file from Telegram later, so no get_file round-trip is made here
+            photos.append({
                 'file_id': photo.file_id,
-                'file_path': file.file_path
+                'file_unique_id': photo.file_unique_id,
+                'width': photo.width,
+                'height': photo.height
             })
             
             await update.message.reply_text(
-                f"✅ Photo received! ({len(session['report_data']['photos'])} total)\n"
+                f"✅ Photo received! ({len(photos)} total)\n"
                 "Send more photos or click 'Submit Report' to finish."
             )
 
@@ -299,29 +481,25 @@ Need immediate help? Contact emergency services: 112
         """Submit the disaster report to backend"""
         user_id = update.effective_user.id
         
-        if user_id not in self.user_sessions:
+        if user_id not in self.user_sessions or user_id in self._inflight:
+            # No report in progress, or this one is already being sent (e.g. a double tap)
             return
         
+        self._inflight.add(user_id)
         session = self.user_sessions[user_id]
         report_data = session['report_data']
+        keep_session = False
         
         try:
-            # Send to your backend API
-            response = requests.post(
-                f"{BACKEND_API_URL}/reports",
-                json=report_data,
-                headers={'Content-Type': 'application/json'}
-            )
+            # Send to your backend API; critical reports go out without waiting for a batch.
+            # Photo metadata is part of report_data, so photos need no requests of their own.
+            if emergency or report_data.get('severity') == 'Critical':
+                result = await self._send_report(report_data)
+            else:
+                result = await self._queue_report(report_data)
             
-            if response.status_code == 201:
-                report_id = response.json().get('id', 'Unknown')
-                
-                # Remove keyboard
-                keyboard = [
-                    [KeyboardButton("🚨 Report Disaster")],
-                    [KeyboardButton("📊 My Reports"), KeyboardButton("ℹ️ Help")]
-                ]
-                reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+            if 'error' not in result:
+                report_id = result.get('id', 'Unknown')
                 
                 success_message = f"""
 ✅ **Report Submitted Successfully!**
@@ -339,59 +517,75 @@ Thank you for helping keep the community safe! 🙏
                 
                 await update.message.reply_text(
                     success_message,
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown'
+                    reply_markup=SUBMITTED_REPLY_MARKUP
                 )
                 
             else:
-                raise Exception(f"API Error: {response.status_code}")
+                raise Exception(f"API Error: {result['error']}")
                 
+        except BackendBusyError:
+            # Keep the session so the user can simply submit again
+            keep_session = True
+            await update.message.reply_text(BUSY_MESSAGE)
         except Exception as e:
-            logger.error(f"Error submitting report: {e}")
+            logger.error("Error submitting report: %s", e)
             await update.message.reply_text(
                 "❌ Error submitting report. Please try again or contact support.\n"
-                f"Error: {str(e)}"
+                f"Error: {str(e)}",
+                parse_mode=None  # the error text may contain Markdown characters
             )
         
         finally:
-            # Clear user session
-            if user_id in self.user_sessions:
-                del self.user_sessions[user_id]
+            self._inflight.discard(user_id)
+            
+            # Clear user session and keep its dicts for the next report
+            if not keep_session:
+                session = self.user_sessions.pop(user_id, None)
+                if session is not None:
+                    self._release_session(session)
 
     async def show_user_reports(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show user's recent reports"""
         user_id = update.effective_user.id
         
         try:
-            response = requests.get(f"{BACKEND_API_URL}/reports/user/{user_id}")
+            response = await self._call_backend(
+                "GET", f"/reports/user/{user_id}",
+                params={'limit': USER_REPORTS_LIMIT, 'fields': USER_REPORTS_FIELDS}
+            )
             
             if response.status_code == 200:
-                reports = response.json()
+                reports = orjson.loads(response.content)
                 
                 if not reports:
                     await update.message.reply_text("📭 You haven't submitted any reports yet.")
                     return
                 
-                message = "📊 **Your Recent Reports:**\n\n"
-                
-                for report in reports[:5]:  # Show last 5 reports
-                    message += f"🆔 **{report.get('id', 'N/A')}**\n"
-                    message += f"🏷️ {report.get('disaster_type', 'N/A')}\n"
-                    message += f"📊 {report.get('severity', 'N/A')}\n"
-                    message += f"📅 {report.get('timestamp', 'N/A')}\n"
-                    message += f"📋 {report.get('status', 'Pending')}\n\n"
+                parts = ["📊 **Your Recent Reports:**"]
+                parts.extend(
+                    REPORT_SUMMARY_TEMPLATE.format_map({**REPORT_SUMMARY_DEFAULTS, **report})
+                    for report in reports
+                )
                 
-                await update.message.reply_text(message, parse_mode='Markdown')
+                await update.message.reply_text("\n\n".join(parts))
                 
             else:
                 await update.message.reply_text("❌ Unable to fetch your reports. Please try again later.")
                 
+        except BackendBusyError:
+            await update.message.reply_text(BUSY_MESSAGE)
         except Exception as e:
-            logger.error(f"Error fetching user reports: {e}")
+            logger.error("Error fetching user reports: %s", e)
             await update.message.reply_text("❌ Error fetching reports. Please try again later.")
 
 def main():
     """Main function to run the bot"""
+    # Configure logging
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    
     if not TELEGRAM_BOT_TOKEN:
         logger.error("TELEGRAM_BOT_TOKEN not found in environment variables")
         return
@@ -400,7 +594,13 @@ def main():
     bot = DisasterReportBot()
     
     # Create application
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    application = Application.builder()\
+        .token(TELEGRAM_BOT_TOKEN)\
+        .defaults(Defaults(parse_mode=ParseMode.MARKDOWN))\
+        .concurrent_updates(MAX_CONCURRENT_UPDATES)\
+        .post_init(bot.start_batching)\
+        .post_shutdown(bot.close)\
+        .build()
     
     # Add handlers
     application.add_handler(CommandHandler("start", bot.start))
@@ -412,8 +612,14 @@ def main():
     application.add_handler(CallbackQueryHandler(bot.button_callback))
     application.add_handler(MessageHandler(filters.LOCATION, bot.handle_location))
     application.add_handler(MessageHandler(filters.PHOTO, bot.handle_photo))
+    
+    # Button texts are matched by their own filters ahead of the generic text handler
+    for text, handler in bot.text_routes.items():
+        application.add_handler(MessageHandler(filters.Text([text]), handler))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, bot.handle_message))
     
+    application.job_queue.run_repeating(bot.log_metrics, interval=60)
+    
     # Start the bot
     logger.info("Starting Telegram Bot...")
     application.run_polling(allowed_updates=Update.ALL_TYPES)